@@ -1,9 +1,13 @@
+import asyncio
+import hashlib
+import heapq
 import os
 import secrets
+import time
 from collections import defaultdict, deque
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Deque, Tuple
+from typing import AsyncIterator, Optional, Dict, Deque, Tuple
 
 from fastapi import (
     FastAPI,
@@ -11,15 +15,20 @@ from fastapi import (
     UploadFile,
     File,
     Form,
+    Query,
     Request,
     Response,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import asyncpg
+from cachetools import TTLCache
+import orjson
+import redis.asyncio as aioredis
 
 # -------------------------------------------------------------------
 # Configuration
@@ -28,6 +37,9 @@ from psycopg2.extras import RealDictCursor
 DATABASE_URL = os.getenv("DATABASE_URL")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "http://localhost:3000")
+# Shared store for sessions + login rate limits. Required when running more
+# than one worker; without it state is kept per process.
+REDIS_URL = os.getenv("REDIS_URL")
 
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is required")
@@ -36,69 +48,115 @@ if not ADMIN_PASSWORD:
     # Force you to set a real admin password in env vars
     raise RuntimeError("ADMIN_PASSWORD environment variable is required")
 
+# Encoded once; compared in constant time on every login
+_ADMIN_PASSWORD_BYTES = ADMIN_PASSWORD.encode()
+
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+SERVE_UPLOADS = os.getenv("SERVE_UPLOADS", "true").lower() not in {"0", "false", "no"}
+UPLOAD_CACHE_CONTROL = "public, max-age=2592000, immutable"
 
 SESSION_AGE = timedelta(days=7)
 SESSION_COOKIE_NAME = "admin_session"
+_SESSION_AGE_SECS = int(SESSION_AGE.total_seconds())
+# In-process session store cap (least recently used evicted first)
+MAX_ADMIN_SESSIONS = 10_000
 
 # Max 5 login attempts per 15 minutes per IP
 LOGIN_WINDOW_SECONDS = 15 * 60
 MAX_LOGIN_ATTEMPTS = 5
+# Rate-limit bookkeeping is plain time.monotonic() floats
+_LOGIN_WINDOW = float(LOGIN_WINDOW_SECONDS)
+MAX_BLOCKED_IPS = 10_000
 
 # Image upload constraints
+# Allowed content type -> extension used for the stored file
 ALLOWED_IMAGE_CONTENT_TYPES = {
-    "image/jpeg",
-    "image/png",
-    "image/webp",
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
 }
 MAX_IMAGE_SIZE_BYTES = 5 * 1024 * 1024  # 5 MB
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024
+# Whole multipart request: one image plus room for the form fields
+MAX_UPLOAD_BODY_BYTES = MAX_IMAGE_SIZE_BYTES + 64 * 1024
+
+# Postgres connection pool bounds
+DB_POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN_CONN", "5"))
+DB_POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX_CONN", "20"))
+
+# Enquiry inserts are grouped: flush every 20 ms or 100 rows
+ENQUIRY_BATCH_MAX_ROWS = 100
+ENQUIRY_BATCH_MAX_WAIT_SECONDS = 0.02
+
+# How long the serialized public product list is reused
+PRODUCTS_CACHE_TTL_SECONDS = 30
+
+# List endpoints use keyset pagination over (created_at, id)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 # -------------------------------------------------------------------
 # App setup
 # -------------------------------------------------------------------
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[FRONTEND_ORIGIN],
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type"],
-)
 
-app.add_middleware(GZipMiddleware, minimum_size=1024)
+class SelectiveGZip:
+    """
+    GZipMiddleware for API responses only. Everything under /uploads is
+    JPEG/PNG/WebP, which is already compressed, so those requests skip the
+    gzip pass entirely.
+    """
 
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+    def __init__(self, app, minimum_size: int = 500):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/uploads/"):
+            await self.app(scope, receive, send)
+            return
+        await self.gzip(scope, receive, send)
+
+
+# orjson output is compact; below ~2 KB gzip costs more than it saves
+app.add_middleware(SelectiveGZip, minimum_size=2048)
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles for /uploads. Upload names carry a content hash, so every
+    file can be cached forever.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = UPLOAD_CACHE_CONTROL
+        return response
+
+
+# In production put nginx or a CDN in front of /uploads (see nginx-uploads.conf)
+# and set SERVE_UPLOADS=false so Python never streams image bytes.
+if SERVE_UPLOADS:
+    app.mount("/uploads", UploadFiles(directory=UPLOAD_DIR), name="uploads")
 
 # -------------------------------------------------------------------
 # DB helpers
 # -------------------------------------------------------------------
 
 
-def get_conn() -> psycopg2.extensions.connection:
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
-
-
-@contextmanager
-def get_db() -> Tuple[psycopg2.extensions.connection, psycopg2.extensions.cursor]:
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        yield conn, cur
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        cur.close()
-        conn.close()
+@asynccontextmanager
+async def get_db() -> AsyncIterator[asyncpg.Connection]:
+    async with app.state.pool.acquire() as conn:
+        async with conn.transaction(isolation="read_committed"):
+            yield conn
 
 
-def init_db() -> None:
-    with get_db() as (_, cur):
-        cur.execute(
+async def init_db() -> None:
+    async with get_db() as conn:
+        await conn.execute(
             """
             CREATE TABLE IF NOT EXISTS enquiries (
                 id BIGSERIAL PRIMARY KEY,
@@ -111,7 +169,13 @@ def init_db() -> None:
             );
             """
         )
-        cur.execute(
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_enquiries_created_desc
+            ON enquiries (created_at DESC, id DESC);
+            """
+        )
+        await conn.execute(
             """
             CREATE TABLE IF NOT EXISTS products (
                 id BIGSERIAL PRIMARY KEY,
@@ -123,66 +187,337 @@ def init_db() -> None:
             );
             """
         )
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_products_created_desc
+            ON products (created_at DESC, id DESC);
+            """
+        )
+
+
+@app.on_event("startup")
+async def open_db_pool() -> None:
+    # One pool per process; create_pool() opens min_size connections up
+    # front so the first requests don't pay for connection setup.
+    app.state.pool = await asyncpg.create_pool(
+        DATABASE_URL,
+        min_size=DB_POOL_MIN_CONN,
+        max_size=DB_POOL_MAX_CONN,
+        command_timeout=60,
+    )
+    await init_db()
 
+    app.state.enquiry_queue = asyncio.Queue()
+    app.state.enquiry_writer = asyncio.create_task(write_enquiries())
+
+
+@app.on_event("shutdown")
+async def close_db_pool() -> None:
+    app.state.enquiry_writer.cancel()
+    await app.state.pool.close()
+
+
+_INSERT_ENQUIRY_SQL = """
+    INSERT INTO enquiries (name, email, phone, message, source_page)
+    VALUES ($1, $2, $3, $4, $5);
+"""
+
+
+async def write_enquiries() -> None:
+    """
+    Background task: drain queued enquiries and insert them in batches of
+    up to ENQUIRY_BATCH_MAX_ROWS rows, one transaction per batch. If a
+    batch fails, its rows are retried one by one so a single bad row only
+    fails its own request.
+    """
+    loop = asyncio.get_running_loop()
+    queue = app.state.enquiry_queue
+
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + ENQUIRY_BATCH_MAX_WAIT_SECONDS
+        while len(batch) < ENQUIRY_BATCH_MAX_ROWS and loop.time() < deadline:
+            try:
+                batch.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                await asyncio.sleep(0.002)
+
+        try:
+            async with get_db() as conn:
+                await conn.executemany(
+                    _INSERT_ENQUIRY_SQL, [row for row, _ in batch]
+                )
+        except Exception:
+            for row, done in batch:
+                await _write_enquiry(row, done)
+        else:
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+
+async def _write_enquiry(row: tuple, done: asyncio.Future) -> None:
+    try:
+        async with get_db() as conn:
+            await conn.execute(_INSERT_ENQUIRY_SQL, *row)
+    except Exception as exc:
+        if not done.done():
+            done.set_exception(exc)
+    else:
+        if not done.done():
+            done.set_result(None)
 
-init_db()
 
 # -------------------------------------------------------------------
 # Sessions + rate limiting
 # -------------------------------------------------------------------
 
-admin_sessions: Dict[str, datetime] = {}
-login_attempts: Dict[str, Deque[datetime]] = defaultdict(deque)
+redis_client: Optional[aioredis.Redis] = (
+    aioredis.from_url(REDIS_URL) if REDIS_URL else None
+)
+
+# Per-process fallbacks, only used when REDIS_URL is not set
+# TTLCache evicts expired sessions itself and caps how many are kept.
+admin_sessions: TTLCache = TTLCache(maxsize=MAX_ADMIN_SESSIONS, ttl=_SESSION_AGE_SECS)
+login_attempts: Dict[str, Deque[float]] = defaultdict(deque)
+
+# IPs known to be over the login limit -> monotonic time the block ends
+blocked_until: Dict[str, float] = {}
+
+
+@app.on_event("startup")
+async def start_login_sweeper() -> None:
+    if redis_client is None:
+        app.state.login_sweeper = asyncio.create_task(sweep_login_attempts())
+
+
+@app.on_event("shutdown")
+async def close_redis() -> None:
+    if redis_client is not None:
+        await redis_client.aclose()
+    else:
+        app.state.login_sweeper.cancel()
+
+
+async def sweep_login_attempts() -> None:
+    """
+    Background task: forget IPs whose login attempts have all aged out of
+    the window, so login_attempts doesn't grow with every client ever seen.
+    """
+    while True:
+        await asyncio.sleep(_LOGIN_WINDOW)
+        now = time.monotonic()
+        for ip, attempts in list(login_attempts.items()):
+            while attempts and now - attempts[0] > _LOGIN_WINDOW:
+                attempts.popleft()
+            if not attempts:
+                del login_attempts[ip]
 
 
 def get_session_token(request: Request) -> Optional[str]:
     return request.cookies.get(SESSION_COOKIE_NAME)
 
 
-def require_admin(request: Request) -> None:
+async def create_session(token: str) -> None:
+    if redis_client is not None:
+        await redis_client.set(f"sess:{token}", "1", ex=_SESSION_AGE_SECS)
+        return
+
+    admin_sessions[token] = time.time()
+
+
+async def drop_session(token: str) -> None:
+    if redis_client is not None:
+        await redis_client.delete(f"sess:{token}")
+        return
+
+    admin_sessions.pop(token, None)
+
+
+async def require_admin(request: Request) -> None:
     token = get_session_token(request)
-    if not token or token not in admin_sessions:
+    if not token:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    if datetime.utcnow() - admin_sessions[token] > SESSION_AGE:
-        admin_sessions.pop(token, None)
-        raise HTTPException(status_code=401, detail="Session expired")
+    if redis_client is not None:
+        # Redis expires the key, so a missing key covers expiry too
+        if not await redis_client.exists(f"sess:{token}"):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+        return
 
+    # Expired sessions have already been evicted by the TTLCache
+    if token not in admin_sessions:
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
-def check_login_rate_limit(client_ip: str) -> None:
-    now = datetime.utcnow()
-    attempts = login_attempts[client_ip]
 
-    # Drop old attempts
-    while attempts and (now - attempts[0]).total_seconds() > LOGIN_WINDOW_SECONDS:
-        attempts.popleft()
+def _block_login(client_ip: str, now: float) -> HTTPException:
+    blocked_until[client_ip] = now + _LOGIN_WINDOW
 
-    if len(attempts) >= MAX_LOGIN_ATTEMPTS:
+    # Keep the negative cache bounded under a wide spray of IPs. Once it
+    # passes MAX_BLOCKED_IPS, keep only the half that stays blocked longest;
+    # evicted IPs just fall back to the normal attempt counters. Each sweep
+    # frees MAX_BLOCKED_IPS / 2 slots, so the O(n) pass is amortized O(1).
+    if len(blocked_until) > MAX_BLOCKED_IPS:
+        keep = heapq.nlargest(
+            MAX_BLOCKED_IPS // 2, blocked_until.items(), key=lambda kv: kv[1]
+        )
+        blocked_until.clear()
+        blocked_until.update((ip, until) for ip, until in keep if until > now)
+
+    return HTTPException(
+        status_code=429,
+        detail="Too many login attempts. Please try again later.",
+    )
+
+
+async def check_login_rate_limit(client_ip: str) -> None:
+    now = time.monotonic()
+
+    # Already throttled: answer without touching Redis or the attempt log
+    if blocked_until.get(client_ip, 0.0) > now:
         raise HTTPException(
             status_code=429,
             detail="Too many login attempts. Please try again later.",
         )
 
+    if redis_client is not None:
+        key = f"login:{client_ip}"
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, LOGIN_WINDOW_SECONDS)
+            count, _ = await pipe.execute()
+
+        if count > MAX_LOGIN_ATTEMPTS:
+            raise _block_login(client_ip, now)
+        return
+
+    attempts = login_attempts[client_ip]
+
+    # Drop old attempts
+    while attempts and now - attempts[0] > _LOGIN_WINDOW:
+        attempts.popleft()
+
+    if len(attempts) >= MAX_LOGIN_ATTEMPTS:
+        raise _block_login(client_ip, now)
+
     attempts.append(now)
 
 
 # -------------------------------------------------------------------
-# Security headers middleware
+# Security headers, body size + CORS middleware
 # -------------------------------------------------------------------
 
 
-@app.middleware("http")
-async def security_headers_middleware(request: Request, call_next):
-    response = await call_next(request)
-    # Basic hardening headers
-    response.headers.setdefault("X-Content-Type-Options", "nosniff")
-    response.headers.setdefault("X-Frame-Options", "DENY")
-    response.headers.setdefault(
-        "Referrer-Policy", "strict-origin-when-cross-origin"
-    )
+# Basic hardening headers, pre-encoded for the raw ASGI header list
+_SEC_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
     # Modern browsers ignore this but we keep it explicit
-    response.headers.setdefault("X-XSS-Protection", "0")
-    return response
+    (b"x-xss-protection", b"0"),
+)
+
+
+class SecurityHeadersASGI:
+    """
+    Pure ASGI middleware that adds basic hardening headers to every HTTP
+    response without building Request/Response objects.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = message.setdefault("headers", [])
+                existing = {name.lower() for name, _ in headers}
+                headers.extend(h for h in _SEC_HEADERS if h[0] not in existing)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class BodySizeLimit:
+    """
+    Pure ASGI middleware that rejects oversize product uploads before
+    Starlette spools the body to disk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT")
+            or not scope["path"].startswith("/api/admin/products")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > MAX_UPLOAD_BODY_BYTES:
+                    await send(
+                        {
+                            "type": "http.response.start",
+                            "status": 413,
+                            "headers": [(b"content-type", b"application/json")],
+                        }
+                    )
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": b'{"detail":"Request body too large."}',
+                        }
+                    )
+                    return
+                break
+
+        # Chunked uploads carry no Content-Length, so also count bytes as
+        # they arrive.
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > MAX_UPLOAD_BODY_BYTES:
+                    raise HTTPException(
+                        status_code=413, detail="Request body too large."
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(BodySizeLimit)
+
+# Registered after BodySizeLimit so it wraps it: early 413s still carry
+# CORS headers and stay readable to the cross-origin admin UI.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[FRONTEND_ORIGIN],
+    allow_credentials=True,
+    # Preflight OPTIONS is answered by the middleware itself, and the admin
+    # UI authenticates with a cookie, so no Authorization header is needed.
+    allow_methods=("GET", "POST", "PUT", "DELETE"),
+    allow_headers=("content-type",),
+    # Let browsers reuse a preflight result for a day
+    max_age=86400,
+)
+
+app.add_middleware(SecurityHeadersASGI)
 
 
 # -------------------------------------------------------------------
@@ -234,13 +569,15 @@ def validate_product_fields(name: str, price: int, description: str) -> Tuple[st
     return clean_name, price_int, clean_desc
 
 
-def secure_filename(filename: str) -> str:
+def validate_cursor(cursor_ts: Optional[datetime], cursor_id: Optional[int]) -> None:
     """
-    Very small sanitiser to avoid path traversal and weird characters.
+    Keyset pagination cursor: the created_at and id of the last row seen.
     """
-    base = os.path.basename(filename or "image")
-    safe = "".join(c for c in base if c.isalnum() or c in {"_", "-", "."})
-    return safe or "image"
+    if (cursor_ts is None) != (cursor_id is None):
+        raise HTTPException(
+            status_code=400,
+            detail="cursor_ts and cursor_id must be given together.",
+        )
 
 
 def save_upload_image(upload: UploadFile) -> str:
@@ -253,31 +590,66 @@ def save_upload_image(upload: UploadFile) -> str:
             detail="Unsupported image type. Allowed: JPEG, PNG, WebP.",
         )
 
-    timestamp = int(datetime.utcnow().timestamp())
-    safe_name = f"{timestamp}_{secure_filename(upload.filename)}"
-    filepath = os.path.join(UPLOAD_DIR, safe_name)
+    # Starlette has already spooled the body, so the size is known before
+    # we write anything to disk.
+    size = upload.size
+    if size is None:
+        upload.file.seek(0, os.SEEK_END)
+        size = upload.file.tell()
+    if size > MAX_IMAGE_SIZE_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail="Image too large. Max size is 5 MB.",
+        )
 
-    size = 0
-    with open(filepath, "wb") as f:
-        for chunk in iter(lambda: upload.file.read(1024 * 1024), b""):
-            if not chunk:
-                break
-            size += len(chunk)
-            if size > MAX_IMAGE_SIZE_BYTES:
-                try:
-                    f.close()
-                    os.remove(filepath)
-                except OSError:
-                    pass
-                raise HTTPException(
-                    status_code=400,
-                    detail="Image too large. Max size is 5 MB.",
-                )
-            f.write(chunk)
+    # Hash while copying so the final name is content-addressed: a changed
+    # image always gets a new URL and can be cached as immutable, and
+    # re-uploading the same image reuses the file already on disk.
+    digest = hashlib.blake2b(digest_size=16)
+    tmp_path = os.path.join(UPLOAD_DIR, f".{secrets.token_hex(8)}.part")
+    upload.file.seek(0)
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: upload.file.read(UPLOAD_CHUNK_BYTES), b""):
+                digest.update(chunk)
+                f.write(chunk)
+
+        ext = ALLOWED_IMAGE_CONTENT_TYPES[upload.content_type]
+        safe_name = f"{digest.hexdigest()}{ext}"
+        canonical = os.path.join(UPLOAD_DIR, safe_name)
+        if os.path.exists(canonical):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, canonical)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
     return f"/uploads/{safe_name}"
 
 
+# -------------------------------------------------------------------
+# Public product list cache
+# -------------------------------------------------------------------
+
+# Serialized GET /api/products payload, shared by all requests until it
+# expires or an admin write invalidates it. "gen" is bumped on every
+# invalidation so a refill that raced with a write is not stored.
+#
+# The cache is per process: invalidation only reaches the worker that
+# handled the admin write. With several workers, the others keep serving
+# the old list for up to PRODUCTS_CACHE_TTL_SECONDS.
+_products_cache = {"body": None, "etag": None, "exp": 0.0, "gen": 0}
+
+
+def invalidate_products_cache() -> None:
+    _products_cache["exp"] = 0.0
+    _products_cache["gen"] += 1
+
+
 # -------------------------------------------------------------------
 # Routes
 # -------------------------------------------------------------------
@@ -289,15 +661,17 @@ def health():
 
 
 @app.post("/api/admin/login")
-def admin_login(request: Request, data: AdminLogin, response: Response):
+async def admin_login(request: Request, data: AdminLogin, response: Response):
     client_ip = request.client.host if request.client else "unknown"
-    check_login_rate_limit(client_ip)
+    await check_login_rate_limit(client_ip)
 
-    if not data.password or data.password != ADMIN_PASSWORD:
+    if not data.password or not secrets.compare_digest(
+        data.password.encode(), _ADMIN_PASSWORD_BYTES
+    ):
         raise HTTPException(status_code=401, detail="Wrong password")
 
     token = secrets.token_hex(32)
-    admin_sessions[token] = datetime.utcnow()
+    await create_session(token)
 
     response.set_cookie(
         key=SESSION_COOKIE_NAME,
@@ -306,16 +680,16 @@ def admin_login(request: Request, data: AdminLogin, response: Response):
         secure=True,
         samesite="none",
         path="/",
-        max_age=int(SESSION_AGE.total_seconds()),
+        max_age=_SESSION_AGE_SECS,
     )
     return {"success": True}
 
 
 @app.post("/api/admin/logout")
-def admin_logout(request: Request, response: Response):
+async def admin_logout(request: Request, response: Response):
     token = get_session_token(request)
-    if token and token in admin_sessions:
-        admin_sessions.pop(token, None)
+    if token:
+        await drop_session(token)
 
     response.delete_cookie(
         key=SESSION_COOKIE_NAME,
@@ -328,7 +702,7 @@ def admin_logout(request: Request, response: Response):
 
 
 @app.post("/api/enquiry")
-def create_enquiry(data: EnquiryIn):
+async def create_enquiry(data: EnquiryIn):
     name = _clean_text(data.name, max_len=200)
     message = _clean_text(data.message, max_len=2_000)
     phone = _clean_text(data.phone, max_len=50)
@@ -340,78 +714,185 @@ def create_enquiry(data: EnquiryIn):
             detail="Name, valid email and message are required.",
         )
 
-    with get_db() as (_, cur):
-        cur.execute(
-            """
-            INSERT INTO enquiries (name, email, phone, message, source_page)
-            VALUES (%s, %s, %s, %s, %s);
-            """,
-            (name, str(data.email), phone, message, source_page),
+    # Postgres TEXT can't store NUL; reject it here rather than in the
+    # batched INSERT.
+    if any("\x00" in v for v in (name, message, phone, source_page)):
+        raise HTTPException(
+            status_code=400,
+            detail="Fields must not contain NUL characters.",
         )
 
+    # Queued for the batch writer; wait for its commit so DB errors still
+    # surface to the client.
+    done = asyncio.get_running_loop().create_future()
+    await app.state.enquiry_queue.put(
+        ((name, str(data.email), phone, message, source_page), done)
+    )
+    await done
+
     return {"success": True, "message": "Enquiry submitted successfully."}
 
 
-@app.get("/api/admin/enquiries")
-def list_enquiries(request: Request):
-    require_admin(request)
+# Column order of the enquiry SELECTs below
+ENQUIRY_COLUMNS = (
+    "id",
+    "name",
+    "email",
+    "phone",
+    "message",
+    "source_page",
+    "created_at",
+)
 
-    with get_db() as (_, cur):
-        cur.execute(
-            """
-            SELECT id, name, email, phone, message, source_page, created_at
-            FROM enquiries
-            ORDER BY created_at DESC;
-            """
-        )
-        rows = cur.fetchall()
 
-    return rows
+@app.get("/api/admin/enquiries")
+async def list_enquiries(
+    request: Request,
+    cursor_ts: Optional[datetime] = None,
+    cursor_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    await require_admin(request)
+    validate_cursor(cursor_ts, cursor_id)
 
+    async with get_db() as conn:
+        if cursor_ts is None:
+            rows = await conn.fetch(
+                """
+                SELECT id, name, email, phone, message, source_page, created_at
+                FROM enquiries
+                ORDER BY created_at DESC, id DESC
+                LIMIT $1;
+                """,
+                limit,
+            )
+        else:
+            rows = await conn.fetch(
+                """
+                SELECT id, name, email, phone, message, source_page, created_at
+                FROM enquiries
+                WHERE (created_at, id) < ($1, $2)
+                ORDER BY created_at DESC, id DESC
+                LIMIT $3;
+                """,
+                cursor_ts,
+                cursor_id,
+                limit,
+            )
 
-@app.get("/api/products")
-def list_products():
-    with get_db() as (_, cur):
-        cur.execute(
+    # Records iterate as plain values; zip them with one shared key tuple
+    # and hand orjson the list directly, skipping FastAPI's per-value
+    # jsonable_encoder pass.
+    return ORJSONResponse([dict(zip(ENQUIRY_COLUMNS, r)) for r in rows])
+
+
+async def fetch_products(
+    conn: asyncpg.Connection,
+    cursor_ts: Optional[datetime] = None,
+    cursor_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list:
+    # LIMIT NULL means no limit in Postgres
+    if cursor_ts is None:
+        return await conn.fetch(
             """
             SELECT id, name, price, description, image, created_at
             FROM products
-            ORDER BY created_at DESC;
-            """
+            ORDER BY created_at DESC, id DESC
+            LIMIT $1;
+            """,
+            limit,
         )
-        rows = cur.fetchall()
-    return rows
+    return await conn.fetch(
+        """
+        SELECT id, name, price, description, image, created_at
+        FROM products
+        WHERE (created_at, id) < ($1, $2)
+        ORDER BY created_at DESC, id DESC
+        LIMIT $3;
+        """,
+        cursor_ts,
+        cursor_id,
+        limit,
+    )
+
+
+@app.get("/api/products")
+async def list_products(
+    request: Request,
+    cursor_ts: Optional[datetime] = None,
+    cursor_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    validate_cursor(cursor_ts, cursor_id)
+
+    # Paged reads go straight to the DB; only the full list is cached
+    if cursor_ts is not None or limit is not None:
+        async with get_db() as conn:
+            rows = await fetch_products(conn, cursor_ts, cursor_id, limit)
+        return [dict(r) for r in rows]
+
+    now = time.monotonic()
+    if now < _products_cache["exp"]:
+        body = _products_cache["body"]
+        etag = _products_cache["etag"]
+    else:
+        gen = _products_cache["gen"]
+        async with get_db() as conn:
+            rows = await fetch_products(conn)
+        body = orjson.dumps([dict(r) for r in rows])
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        # An admin write that invalidated the cache during the fetch may not
+        # be in these rows: serve them to this request, but don't cache them.
+        if _products_cache["gen"] == gen:
+            _products_cache["body"] = body
+            _products_cache["etag"] = etag
+            _products_cache["exp"] = now + PRODUCTS_CACHE_TTL_SECONDS
+
+    # no-cache: browsers may keep the list but must revalidate, so admins
+    # see their edits immediately and everyone else gets a cheap 304.
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @app.post("/api/admin/products")
-def create_product(
+async def create_product(
     request: Request,
     name: str = Form(...),
     price: int = Form(...),
     description: str = Form(""),
     image: UploadFile = File(...),
 ):
-    require_admin(request)
+    await require_admin(request)
 
     clean_name, price_int, clean_desc = validate_product_fields(
         name, price, description
     )
-    img_path = save_upload_image(image)
+    # Disk I/O stays off the event loop
+    img_path = await run_in_threadpool(save_upload_image, image)
 
-    with get_db() as (_, cur):
-        cur.execute(
+    async with get_db() as conn:
+        row = await conn.fetchrow(
             """
             INSERT INTO products (name, price, description, image)
-            VALUES (%s, %s, %s, %s);
+            VALUES ($1, $2, $3, $4)
+            RETURNING id, name, price, description, image, created_at;
             """,
-            (clean_name, price_int, clean_desc, img_path),
+            clean_name,
+            price_int,
+            clean_desc,
+            img_path,
         )
 
-    return {"success": True}
+    invalidate_products_cache()
+    return {"success": True, "product": dict(row)}
 
 
 @app.put("/api/admin/products/{product_id}")
-def update_product(
+async def update_product(
     product_id: int,
     request: Request,
     name: str = Form(...),
@@ -419,41 +900,60 @@ def update_product(
     description: str = Form(""),
     image: UploadFile = File(None),
 ):
-    require_admin(request)
+    await require_admin(request)
 
     clean_name, price_int, clean_desc = validate_product_fields(
         name, price, description
     )
 
-    with get_db() as (_, cur):
-        if image is not None:
-            img_path = save_upload_image(image)
-            cur.execute(
-                """
-                UPDATE products
-                SET name=%s, price=%s, description=%s, image=%s
-                WHERE id=%s;
-                """,
-                (clean_name, price_int, clean_desc, img_path, product_id),
-            )
-        else:
-            cur.execute(
-                """
-                UPDATE products
-                SET name=%s, price=%s, description=%s
-                WHERE id=%s;
-                """,
-                (clean_name, price_int, clean_desc, product_id),
+    img_path = None
+    if image is not None:
+        # Check the product exists first so a 404 doesn't leave a new,
+        # unreferenced image behind in UPLOAD_DIR.
+        async with get_db() as conn:
+            exists = await conn.fetchval(
+                "SELECT 1 FROM products WHERE id=$1;", product_id
             )
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Product not found.")
 
-    return {"success": True}
+        img_path = await run_in_threadpool(save_upload_image, image)
+
+    # A single statement shape for both cases: asyncpg prepares it once per
+    # connection and reuses the plan; a NULL image keeps the current one.
+    async with get_db() as conn:
+        row = await conn.fetchrow(
+            """
+            UPDATE products
+            SET name=$1, price=$2, description=$3, image=COALESCE($4, image)
+            WHERE id=$5
+            RETURNING id, name, price, description, image, created_at;
+            """,
+            clean_name,
+            price_int,
+            clean_desc,
+            img_path,
+            product_id,
+        )
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Product not found.")
+
+    invalidate_products_cache()
+    return {"success": True, "product": dict(row)}
 
 
 @app.delete("/api/admin/products/{product_id}")
-def delete_product(product_id: int, request: Request):
-    require_admin(request)
+async def delete_product(product_id: int, request: Request):
+    await require_admin(request)
+
+    async with get_db() as conn:
+        deleted_id = await conn.fetchval(
+            "DELETE FROM products WHERE id=$1 RETURNING id;", product_id
+        )
 
-    with get_db() as (_, cur):
-        cur.execute("DELETE FROM products WHERE id=%s;", (product_id,))
+    if deleted_id is None:
+        raise HTTPException(status_code=404, detail="Product not found.")
 
+    invalidate_products_cache()
     return {"success": True}